@@ -6,14 +6,16 @@ Local:  python app.py  →  http://localhost:5050
 
 import os
 import sys
-import json
-import time
+import gzip
+import tempfile
 import logging
 import threading
-import schedule
+from collections import deque
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+import orjson
 from flask import Flask, render_template, jsonify, request, Response
+from flask.json.provider import DefaultJSONProvider
 from dotenv import load_dotenv
 
 load_dotenv(Path(__file__).parent / ".env")
@@ -21,43 +23,100 @@ load_dotenv(Path(__file__).parent / ".env")
 sys.path.insert(0, str(Path(__file__).parent))
 import flight_checker as fc
 
+# On Vercel periodic checks come from the cron in vercel.json hitting
+# /api/check, so the in-process scheduler is never started there.
+IS_VERCEL = bool(os.environ.get("VERCEL"))
+
+# `FLASK_DEBUG=1 python app.py` runs Werkzeug's reloader: this module is first
+# imported by a watcher process that never serves requests, which re-runs it
+# in a child with WERKZEUG_RUN_MAIN=true. Only the child may schedule checks.
+DEBUG = os.environ.get("FLASK_DEBUG", "0") == "1"
+IS_RELOADER_PARENT = (
+    __name__ == "__main__" and DEBUG and os.environ.get("WERKZEUG_RUN_MAIN") != "true"
+)
+
 # ── Flask app ─────────────────────────────────────────────────────────────────
+
+class _OrjsonProvider(DefaultJSONProvider):
+    """Route jsonify() and request.get_json() through orjson."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = _OrjsonProvider(app)
 log = logging.getLogger(__name__)
 
 # ── Shared state ──────────────────────────────────────────────────────────────
 _state = {
-    "checking":      False,
     "next_check_at": None,
     "check_count":   0,
-    "sse_listeners": [],
+    "sse_listeners": (),   # copy-on-write: replaced, never mutated in place
 }
 _state_lock = threading.Lock()
-
-import queue
+# Held for the duration of a check; `_check_lock.locked()` is "checking?".
+_check_lock = threading.Lock()
 
 # ── SSE helpers ───────────────────────────────────────────────────────────────
 
+class _SSEListener:
+    """Per-client ring buffer: a stalled client loses its oldest events,
+    never the connection."""
+
+    def __init__(self, maxlen: int = 20) -> None:
+        self.events: deque = deque(maxlen=maxlen)
+        self.cond = threading.Condition()
+        self.dropped = 0
+
+    def push(self, payload: bytes) -> None:
+        with self.cond:
+            if len(self.events) == self.events.maxlen:
+                self.dropped += 1
+            self.events.append(payload)
+            self.cond.notify()
+
+    def pop(self, timeout: float) -> tuple[bytes | None, int]:
+        """Wait up to `timeout` s; return (payload or None, events dropped since last pop)."""
+        with self.cond:
+            if not self.events:
+                self.cond.wait(timeout)
+            dropped, self.dropped = self.dropped, 0
+            return (self.events.popleft() if self.events else None), dropped
+
+
 def _broadcast(event: str, data: dict) -> None:
-    payload = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    # Framed once as bytes; every listener gets the same object.
+    payload = b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
     with _state_lock:
-        dead = []
-        for q in _state["sse_listeners"]:
-            try:
-                q.put_nowait(payload)
-            except queue.Full:
-                dead.append(q)
-        for q in dead:
-            _state["sse_listeners"].remove(q)
+        listeners = _state["sse_listeners"]
+    # Fan out on the snapshot, outside the lock; listeners deregister
+    # themselves when their stream closes.
+    for listener in listeners:
+        listener.push(payload)
 
 
-# ── Background checker ────────────────────────────────────────────────────────
+def _add_listener(listener: _SSEListener) -> None:
+    with _state_lock:
+        _state["sse_listeners"] = _state["sse_listeners"] + (listener,)
 
-def _do_check() -> None:
+
+def _remove_listener(listener: _SSEListener) -> None:
     with _state_lock:
-        if _state["checking"]:
-            return
-        _state["checking"] = True
+        _state["sse_listeners"] = tuple(
+            other for other in _state["sse_listeners"] if other is not listener
+        )
+
+
+# ── Background checker ────────────────────────────────────────────────────────
+
+def _do_check() -> bool:
+    """Run one check; return False without doing anything if one is already running."""
+    if not _check_lock.acquire(blocking=False):
+        return False
 
     _broadcast("checking", {"checking": True})
     try:
@@ -73,33 +132,107 @@ def _do_check() -> None:
                 "all_offers": result.get("all_offers", []),
             })
     finally:
-        with _state_lock:
-            _state["checking"] = False
+        _check_lock.release()
         _broadcast("checking", {"checking": False})
+    return True
 
 
-def _scheduler_loop() -> None:
-    # Schedule periodic checks but do NOT run one immediately on startup.
-    # Running immediately on startup causes a race: Render kills the process
-    # mid-check (SIGTERM), the finally block never fires, and `checking` stays
-    # stuck at True until the next cold-start — blocking every manual trigger.
-    next_time = datetime.now(timezone.utc) + timedelta(hours=fc.CHECK_EVERY_HOURS)
+def _schedule_next_check() -> None:
+    """Arm a one-shot timer for the next periodic check.
+
+    Only a timer is armed here — no check runs on startup. Running one
+    immediately causes a race: Render kills the process mid-check (SIGTERM),
+    the finally block never fires, and `checking` stays stuck at True until
+    the next cold-start — blocking every manual trigger.
+    """
+    interval = fc.CHECK_EVERY_HOURS * 3600
+    next_time = datetime.now(timezone.utc) + timedelta(seconds=interval)
     with _state_lock:
         _state["next_check_at"] = next_time.strftime("%Y-%m-%d %H:%M")
-    schedule.every(fc.CHECK_EVERY_HOURS).hours.do(_do_check)
-    while True:
-        schedule.run_pending()
-        time.sleep(30)
+    timer = threading.Timer(interval, _scheduled_check)
+    timer.daemon = True
+    timer.start()
+
+
+def _scheduled_check() -> None:
+    try:
+        _do_check()
+    finally:
+        _schedule_next_check()
+
+
+SCHEDULER_LOCK_FILE = Path(__file__).parent / "scheduler.lock"
+# Used when the app directory is read-only (e.g. a read-only container root).
+FALLBACK_SCHEDULER_LOCK_FILE = Path(tempfile.gettempdir()) / "flight_checker_scheduler.lock"
+_scheduler_lock = None   # held open for the life of the scheduling process
+
+
+def _claim_scheduler() -> bool:
+    """Return True in exactly one process per host.
 
+    Gunicorn imports this module once per worker; an exclusive flock makes
+    sure only one of them runs periodic checks. The OS drops the lock when
+    that worker exits, and its replacement picks it up on import.
+    """
+    global _scheduler_lock
+    try:
+        import fcntl
+    except ImportError:   # Windows – no gunicorn, always a single process
+        return True
+    for path in (SCHEDULER_LOCK_FILE, FALLBACK_SCHEDULER_LOCK_FILE):
+        try:
+            f = open(path, "w")
+            break
+        except OSError:
+            continue
+    else:
+        log.warning("No writable location for the scheduler lock – "
+                    "periodic checks disabled in this process.")
+        return False
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return False
+    _scheduler_lock = f
+    return True
+
+
+if not IS_VERCEL and not IS_RELOADER_PARENT and _claim_scheduler():
+    _schedule_next_check()
+
+# ── Conditional GET helpers ───────────────────────────────────────────────────
+
+def _file_version(path: Path) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def _not_modified(etag: str) -> Response | None:
+    """Return a bodiless 304 if the client already holds `etag`."""
+    if request.if_none_match.contains_weak(etag):
+        resp = Response(status=304)
+        resp.set_etag(etag, weak=True)
+        return resp
+    return None
+
+
+def _with_etag(resp: Response, etag: str) -> Response:
+    # no-cache (not max-age) so the dashboard's refresh after a manual check
+    # always revalidates instead of showing a stale cached copy.
+    resp.set_etag(etag, weak=True)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
 
-t = threading.Thread(target=_scheduler_loop, daemon=True)
-t.start()
 
 # ── Routes ────────────────────────────────────────────────────────────────────
 
-@app.route("/")
-def index():
-    return render_template(
+# Everything the page and the config block depend on is a module constant,
+# so render/serialise them once at import instead of on every request.
+with app.app_context():
+    _INDEX_HTML = render_template(
         "index.html",
         origin=fc.ORIGIN,
         destination=fc.DESTINATION,
@@ -107,33 +240,52 @@ def index():
         return_date=fc.RETURN_DATE,
         price_limit=fc.PRICE_LIMIT,
         check_hours=fc.CHECK_EVERY_HOURS,
+    ).encode()
+
+_CONFIG_JSON = orjson.Fragment(orjson.dumps({
+    "origin":      fc.ORIGIN,
+    "destination": fc.DESTINATION,
+    "depart_date": fc.DEPART_DATE,
+    "return_date": fc.RETURN_DATE,
+    "price_limit": fc.PRICE_LIMIT,
+    "check_hours": fc.CHECK_EVERY_HOURS,
+}))
+
+
+@app.route("/")
+def index():
+    return Response(
+        _INDEX_HTML,
+        mimetype="text/html",
+        headers={"Cache-Control": "public, max-age=3600"},
     )
 
 
 @app.route("/api/status")
 def api_status():
-    status  = fc.load_status()
-    history = fc.load_history()
+    checking = _check_lock.locked()
     with _state_lock:
-        checking      = _state["checking"]
         next_check_at = _state["next_check_at"]
         check_count   = _state["check_count"]
 
-    return jsonify({
-        "config": {
-            "origin":      fc.ORIGIN,
-            "destination": fc.DESTINATION,
-            "depart_date": fc.DEPART_DATE,
-            "return_date": fc.RETURN_DATE,
-            "price_limit": fc.PRICE_LIMIT,
-            "check_hours": fc.CHECK_EVERY_HOURS,
-        },
+    etag = (
+        f"{_file_version(fc.STATUS_FILE):x}-{_file_version(fc.HISTORY_FILE):x}"
+        f"-{check_count}-{int(checking)}-{(next_check_at or '').replace(' ', 'T')}"
+    )
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    status  = fc.load_status()
+    history = fc.load_recent_history(50)
+    return _with_etag(jsonify({
+        "config":        _CONFIG_JSON,
         "current":       status,
-        "history":       history[-50:],
+        "history":       history,
         "checking":      checking,
         "next_check_at": next_check_at,
         "check_count":   check_count,
-    })
+    }), etag)
 
 
 @app.route("/api/check", methods=["POST", "GET"])
@@ -141,46 +293,59 @@ def api_check():
     """Trigger a price check. Always runs synchronously and returns the result.
     Running in-request (not a background thread) means the result is returned
     directly and there is no in-memory state that can get stuck between restarts."""
-    with _state_lock:
-        if _state["checking"]:
-            # A scheduled check is already running — return latest saved status.
-            return jsonify({"status": "already_running", "result": fc.load_status()})
-
-    _do_check()   # blocks ~20-30 s; fine within gunicorn's 120 s timeout
+    # Blocks ~20-30 s; fine within gunicorn's 120 s timeout.
+    if not _do_check():
+        # A scheduled check is already running — return latest saved status.
+        return jsonify({"status": "already_running", "result": fc.load_status()})
     return jsonify({"status": "done", "result": fc.load_status()})
 
 
+_history_gzip: tuple = (None, b"")   # (etag, gzipped JSON array)
+
+
 @app.route("/api/history")
 def api_history():
-    return jsonify(fc.load_history())
+    global _history_gzip
+    etag = f"{_file_version(fc.HISTORY_FILE):x}"
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    body = fc.load_history_json()
+    if request.accept_encodings["gzip"]:
+        # Compress once per history version, not once per request.
+        if _history_gzip[0] != etag:
+            _history_gzip = (etag, gzip.compress(body))
+        resp = Response(_history_gzip[1], mimetype="application/json")
+        resp.headers["Content-Encoding"] = "gzip"
+    else:
+        resp = Response(body, mimetype="application/json")
+    resp.vary.add("Accept-Encoding")
+    return _with_etag(resp, etag)
 
 
 @app.route("/stream")
 def stream():
     """SSE endpoint — only useful in local mode."""
-    q: queue.Queue = queue.Queue(maxsize=20)
-    with _state_lock:
-        _state["sse_listeners"].append(q)
+    listener = _SSEListener(maxlen=20)
+    _add_listener(listener)
 
     def generate():
-        yield ": connected\n\n"
+        yield b": connected\n\n"
         try:
             while True:
-                try:
-                    msg = q.get(timeout=30)
-                    yield msg
-                except queue.Empty:
-                    yield ": heartbeat\n\n"
-        except GeneratorExit:
-            with _state_lock:
-                try:
-                    _state["sse_listeners"].remove(q)
-                except ValueError:
-                    pass
+                msg, dropped = listener.pop(timeout=30)
+                if dropped:
+                    # Tell the page it missed events so it re-fetches /api/status.
+                    yield b"event: resync\ndata: " + orjson.dumps({"dropped": dropped}) + b"\n\n"
+                yield msg if msg is not None else b": heartbeat\n\n"
+        finally:
+            _remove_listener(listener)
 
     return Response(
         generate(),
         mimetype="text/event-stream",
+        direct_passthrough=True,
         headers={
             "Cache-Control":               "no-cache",
             "X-Accel-Buffering":           "no",
@@ -194,4 +359,4 @@ def stream():
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5050))
     print(f"\n  ✈  Flight Price Monitor  –  http://localhost:{port}\n")
-    app.run(host="127.0.0.1", port=port, debug=os.environ.get("FLASK_DEBUG", "0") == "1", threaded=True)
+    app.run(host="127.0.0.1", port=port, debug=DEBUG, threaded=True)
@@ -8,19 +8,46 @@ Notifies when price drops below 8000 SEK
 import os
 import sys
 import time
-import json
+import heapq
+import random
+import signal
+import tempfile
 import logging
-import smtplib
-import schedule
+import logging.handlers
+import msgspec
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import deque
+from operator import itemgetter
 from datetime import datetime, timezone
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from pathlib import Path
+from types import SimpleNamespace
 from dotenv import load_dotenv
-from colorama import init, Fore, Style
 
-init(autoreset=True)
+if not sys.stdout.isatty():
+    # Piped/daemon output: no escape codes at all.
+    Fore  = SimpleNamespace(CYAN="", WHITE="", GREEN="", YELLOW="")
+    Style = SimpleNamespace(RESET_ALL="")
+else:
+    from colorama import init, Fore, Style
+    if os.name == "nt":
+        # Only the Windows console needs colorama's ANSI translation wrapper;
+        # _write_lines() resets colour per line itself, so no autoreset.
+        init()
+
+# Report rules, built once rather than on every check.
+_SEP       = "─" * 60
+_HEAD      = f"{Fore.CYAN}{_SEP}"
+_ALERT_SEP = "=" * 60
+
+
+def _write_lines(lines: list[str]) -> None:
+    """Write a block of report lines with one stdout write instead of a
+    print() per line; each line ends with a colour reset like autoreset."""
+    sys.stdout.write("".join(f"{line}{Style.RESET_ALL}\n" for line in lines))
+    sys.stdout.flush()
 
 # ── Configuration ────────────────────────────────────────────────────────────
 
@@ -32,56 +59,204 @@ ADULTS      = 1
 CURRENCY    = "SEK"
 PRICE_LIMIT = 8000           # SEK – alert threshold
 CHECK_EVERY_HOURS = 6        # How often to check (hours)
+SEARCH_CACHE_MINUTES = 15    # Re-checks within this window reuse the last result
 
-HISTORY_FILE = Path(__file__).parent / "price_history.json"
+HISTORY_FILE = Path(__file__).parent / "price_history.jsonl"
+LEGACY_HISTORY_FILE = Path(__file__).parent / "price_history.json"   # pre-JSONL array
 STATUS_FILE  = Path(__file__).parent / "status.json"
+# /tmp is the one writable path on serverless, and it survives between
+# invocations of a warm container.
+TOKEN_CACHE_FILE = Path(tempfile.gettempdir()) / "amadeus_token.json"
 
 # ── Logging ──────────────────────────────────────────────────────────────────
 
+_LOG_FORMAT  = "%(asctime)s  %(levelname)-8s %(message)s"
+_LOG_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+# The log file rotates at ~1 MB (3 backups kept). Records are buffered and
+# written 64 at a time, or immediately for WARNING and above.
+_log_file = logging.handlers.RotatingFileHandler(
+    Path(__file__).parent / "flight_checker.log",
+    maxBytes=1_000_000,
+    backupCount=3,
+    encoding="utf-8",
+    delay=True,
+)
+_log_file.setFormatter(logging.Formatter(_LOG_FORMAT, _LOG_DATEFMT))
+
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s  %(levelname)-8s %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
+    format=_LOG_FORMAT,
+    datefmt=_LOG_DATEFMT,
     handlers=[
-        logging.FileHandler(Path(__file__).parent / "flight_checker.log", encoding="utf-8"),
+        logging.handlers.MemoryHandler(capacity=64, flushLevel=logging.WARNING, target=_log_file),
         logging.StreamHandler(sys.stdout),
     ],
 )
 log = logging.getLogger(__name__)
 
+# ── HTTP session ──────────────────────────────────────────────────────────────
+
+# One keep-alive session so the token request and the search share a TLS
+# connection. raise_on_status=False hands the last failed response back to
+# raise_for_status(), so callers still see a regular HTTPError.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    ),
+))
+
+# (connect, read) timeouts in seconds – a dead host fails fast instead of
+# eating the whole read budget while the dashboard shows "checking".
+TOKEN_TIMEOUT  = (5, 15)
+SEARCH_TIMEOUT = (5, 20)
+
 # ── Amadeus token cache ───────────────────────────────────────────────────────
 
-_token_cache: dict = {"token": None, "expires_at": 0}
+_token_cache: dict = {"client_id": None, "token": None, "expires_at": 0}
+
+
+class _Token(msgspec.Struct):
+    """The two OAuth response fields we use; the rest are skipped on decode."""
+    access_token: str
+    expires_in: int
+
+
+_token_decoder = msgspec.json.Decoder(_Token)
+
+# Amadeus tokens live ~30 min; never trust a cached expiry further out than this.
+TOKEN_CACHE_MAX_AGE = 3600
+
+
+class _CachedToken(msgspec.Struct):
+    client_id: str
+    token: str
+    expires_at: float
+
+
+_cached_token_decoder = msgspec.json.Decoder(_CachedToken)
+
+
+def _load_token_cache() -> None:
+    """Seed _token_cache from disk so a fresh process can reuse a live token.
+
+    The file lives in a shared temp dir, so anything malformed is a cache miss
+    and the expiry is capped rather than taken on trust.
+    """
+    try:
+        cached = _cached_token_decoder.decode(TOKEN_CACHE_FILE.read_bytes())
+    except (OSError, msgspec.DecodeError):   # ValidationError is a DecodeError
+        return
+    _token_cache["client_id"]  = cached.client_id
+    _token_cache["token"]      = cached.token
+    _token_cache["expires_at"] = min(cached.expires_at, time.time() + TOKEN_CACHE_MAX_AGE)
+
+
+def _forget_token() -> None:
+    """Drop a token the API rejected, in memory and on disk."""
+    _token_cache.update({"client_id": None, "token": None, "expires_at": 0})
+    try:
+        TOKEN_CACHE_FILE.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        log.warning("Could not remove cached Amadeus token: %s", exc)
+
+
+def _save_token_cache() -> None:
+    """Atomically persist _token_cache; mkstemp creates the file as 0600."""
+    fd, tmp = tempfile.mkstemp(dir=TOKEN_CACHE_FILE.parent, prefix=".amadeus_token.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(_token_cache))
+        os.replace(tmp, TOKEN_CACHE_FILE)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+_load_token_cache()
 
 
 def get_amadeus_token(client_id: str, client_secret: str) -> str:
     """Fetch (or reuse) an Amadeus OAuth2 access token."""
-    if time.time() < _token_cache["expires_at"] - 60:
+    if _token_cache["client_id"] == client_id and time.time() < _token_cache["expires_at"] - 60:
         return _token_cache["token"]
 
-    resp = requests.post(
+    resp = _session.post(
         "https://test.api.amadeus.com/v1/security/oauth2/token",
         data={
             "grant_type": "client_credentials",
             "client_id": client_id,
             "client_secret": client_secret,
         },
-        timeout=15,
+        timeout=TOKEN_TIMEOUT,
     )
     resp.raise_for_status()
-    data = resp.json()
-    _token_cache["token"] = data["access_token"]
-    _token_cache["expires_at"] = time.time() + data["expires_in"]
+    data = _token_decoder.decode(resp.content)
+    _token_cache["client_id"] = client_id
+    _token_cache["token"] = data.access_token
+    _token_cache["expires_at"] = time.time() + data.expires_in
+    try:
+        _save_token_cache()
+    except OSError as exc:
+        log.warning("Could not cache Amadeus token: %s", exc)
     return _token_cache["token"]
 
 
 # ── Flight search ─────────────────────────────────────────────────────────────
 
-def search_flights(client_id: str, client_secret: str) -> list[dict]:
-    """Query Amadeus for round-trip offers and return a simplified list."""
-    token = get_amadeus_token(client_id, client_secret)
-    headers = {"Authorization": f"Bearer {token}"}
+# Only the fields we read from /v2/shopping/flight-offers; msgspec skips the
+# rest of the payload while decoding straight into these structs.
+
+class _Segment(msgspec.Struct):
+    carrierCode: str
+
+
+class _Itinerary(msgspec.Struct):
+    segments: list[_Segment]
+
+
+class _Price(msgspec.Struct):
+    grandTotal: str
+
+
+class _Offer(msgspec.Struct):
+    price: _Price
+    itineraries: list[_Itinerary]
+
+
+class _FlightOffers(msgspec.Struct):
+    data: list[_Offer] = []
+
+
+_offers_decoder = msgspec.json.Decoder(_FlightOffers)
+
+# IATA carrier code -> one shared str, so the handful of codes seen across
+# offers and checks hash once and aren't duplicated in cached offers.
+_carrier_codes: dict[str, str] = {}
+
+# search params -> (time.monotonic() of the fetch, UTC fetch time, offers)
+_search_cache: dict = {}
+
+
+def search_flights(client_id: str, client_secret: str) -> tuple[datetime, list[dict], bool]:
+    """Query Amadeus for round-trip offers; return (fetched_at, 5 cheapest, reused).
 
+    A result younger than SEARCH_CACHE_MINUTES for the same query is reused
+    without touching the network, so back-to-back manual checks cost nothing;
+    `reused` is True in that case and `fetched_at` is the UTC time of the
+    original request.
+    """
     params = {
         "originLocationCode":      ORIGIN,
         "destinationLocationCode": DESTINATION,
@@ -93,37 +268,98 @@ def search_flights(client_id: str, client_secret: str) -> list[dict]:
         "max":                     10,
     }
 
-    resp = requests.get(
+    key = tuple(params.items())
+    hit = _search_cache.get(key)
+    if hit is not None and time.monotonic() - hit[0] < SEARCH_CACHE_MINUTES * 60:
+        log.info("Reusing offers fetched %.0f s ago", time.monotonic() - hit[0])
+        return hit[1], hit[2], True
+
+    token = get_amadeus_token(client_id, client_secret)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    resp = _session.get(
         "https://test.api.amadeus.com/v2/shopping/flight-offers",
         headers=headers,
         params=params,
-        timeout=20,
+        timeout=SEARCH_TIMEOUT,
     )
+    if resp.status_code == 401:
+        _forget_token()   # revoked/expired early – the next check fetches a new one
     resp.raise_for_status()
-    raw = resp.json()
+    raw = _offers_decoder.decode(resp.content)
 
     offers = []
-    for offer in raw.get("data", []):
-        price = float(offer["price"]["grandTotal"])
-        airlines = list({
-            seg["carrierCode"]
-            for itin in offer["itineraries"]
-            for seg in itin["segments"]
-        })
-        stops_out = len(offer["itineraries"][0]["segments"]) - 1
-        stops_ret = len(offer["itineraries"][1]["segments"]) - 1 if len(offer["itineraries"]) > 1 else 0
+    intern = _carrier_codes.setdefault
+    for offer in raw.data:
+        itins = offer.itineraries
+        airlines = set()
+        for itin in itins:
+            for seg in itin.segments:
+                code = seg.carrierCode
+                airlines.add(intern(code, code))
         offers.append({
-            "price": price,
-            "airlines": airlines,
-            "stops_outbound": stops_out,
-            "stops_return": stops_ret,
+            "price": float(offer.price.grandTotal),
+            "airlines": list(airlines),
+            "stops_outbound": len(itins[0].segments) - 1,
+            "stops_return": len(itins[1].segments) - 1 if len(itins) > 1 else 0,
         })
 
-    return sorted(offers, key=lambda x: x["price"])
+    cheapest = heapq.nsmallest(5, offers, key=itemgetter("price"))
+    fetched_at = datetime.now(timezone.utc)
+    _search_cache[key] = (time.monotonic(), fetched_at, cheapest)
+    return fetched_at, cheapest, False
+
+
+def _search_with_retry(client_id: str, client_secret: str, attempts: int = 3) -> tuple[datetime, list[dict], bool]:
+    """search_flights, retried with exponential backoff plus jitter on 429/5xx.
+
+    The session adapter already retries within a second or two; this covers
+    an API that stays overloaded a little longer, instead of giving up until
+    the next scheduled check.
+    """
+    for attempt in range(attempts):
+        try:
+            return search_flights(client_id, client_secret)
+        except requests.HTTPError as exc:
+            status = exc.response.status_code
+            if attempt == attempts - 1 or status not in (429, 502, 503, 504):
+                raise
+            delay = 2 ** attempt + random.random()
+            log.warning("API returned %s, retrying in %.1f s", status, delay)
+            time.sleep(delay)
 
 
 # ── Email notification ────────────────────────────────────────────────────────
 
+# Logged-in SMTP connection kept between alerts: (login user, SMTP_SSL).
+_smtp: tuple | None = None
+
+
+def _get_smtp(user: str, password: str):
+    """Return a logged-in SMTP_SSL connection, reusing the previous one while
+    it still answers NOOP."""
+    global _smtp
+    import smtplib
+
+    if _smtp is not None:
+        cached_user, server = _smtp
+        try:
+            if cached_user == user and server.noop()[0] == 250:
+                return server
+        except (smtplib.SMTPException, OSError):
+            pass
+        try:
+            server.close()
+        except Exception:
+            pass
+        _smtp = None
+
+    server = smtplib.SMTP_SSL("smtp.gmail.com", 465, timeout=15)
+    server.login(user, password)
+    _smtp = (user, server)
+    return server
+
+
 def email_notify(subject: str, body: str) -> None:
     smtp_email   = os.getenv("SMTP_EMAIL")
     smtp_password = os.getenv("SMTP_PASSWORD")
@@ -132,49 +368,174 @@ def email_notify(subject: str, body: str) -> None:
     if not all([smtp_email, smtp_password, notify_email]):
         return  # email not configured, skip silently
 
+    # Imported here: only needed when an alert actually fires, and keeps it
+    # off the serverless cold-start path.
+    from email.message import EmailMessage
+
     try:
-        msg = MIMEMultipart("alternative")
+        msg = EmailMessage()
         msg["Subject"] = subject
         msg["From"]    = smtp_email
         msg["To"]      = notify_email
-        msg.attach(MIMEText(body, "plain", "utf-8"))
+        msg.set_content(body)
 
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465, timeout=15) as server:
-            server.login(smtp_email, smtp_password)
-            server.sendmail(smtp_email, notify_email, msg.as_string())
+        _get_smtp(smtp_email, smtp_password).send_message(msg)
         log.info("Email notification sent to %s", notify_email)
     except Exception as exc:
         log.warning("Email notification failed: %s", exc)
 
 
+# ── Cached file reads ─────────────────────────────────────────────────────────
+
+# (path, variant) -> ((st_mtime_ns, st_size), parsed value)
+_file_cache: dict = {}
+
+
+def _cached_json(path: Path, parse, variant: str = ""):
+    """Return parse(path), reusing the last result while the file is unchanged.
+
+    Callers share the cached object, so treat the result as read-only.
+    """
+    key = (path, variant)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        _file_cache.pop(key, None)
+        return None
+    version = (st.st_mtime_ns, st.st_size)
+    hit = _file_cache.get(key)
+    if hit is not None and hit[0] == version:
+        return hit[1]
+    value = parse(path)
+    _file_cache[key] = (version, value)
+    return value
+
+
 # ── Price history ─────────────────────────────────────────────────────────────
 
+def _read_history(path: Path) -> list:
+    with open(path, "rb") as f:
+        lines = f.readlines()
+    return [orjson.loads(line) for line in lines if line.strip()]
+
+
+def _read_history_tail(path: Path, limit: int, tail_bytes: int) -> list:
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - tail_bytes))
+        lines = f.read().splitlines()
+    if size > tail_bytes:
+        lines = lines[1:]   # first line is most likely cut in half
+    recent = deque((line for line in lines if line.strip()), maxlen=limit)
+    return [orjson.loads(line) for line in recent]
+
+
 def load_history() -> list:
-    if HISTORY_FILE.exists():
-        with open(HISTORY_FILE, encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    """Read the full price history (one JSON object per line)."""
+    return _cached_json(HISTORY_FILE, _read_history) or []
+
+
+def _read_history_array(path: Path) -> bytes:
+    # Every line is already a serialised JSON object, so joining them gives
+    # the JSON array without a parse/serialise round-trip.
+    with open(path, "rb") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    return b"[" + b",".join(lines) + b"]"
+
+
+def load_history_json() -> bytes:
+    """The full price history as a ready-to-send JSON array."""
+    return _cached_json(HISTORY_FILE, _read_history_array, variant="array") or b"[]"
+
+
+def load_recent_history(limit: int = 50, tail_bytes: int = 64 * 1024) -> list:
+    """Return the last `limit` history entries, reading only the file's tail."""
+    return _cached_json(
+        HISTORY_FILE,
+        lambda path: _read_history_tail(path, limit, tail_bytes),
+        variant=f"tail:{limit}:{tail_bytes}",
+    ) or []
+
+
+# (path, fd) opened once with O_APPEND and kept for the life of the process.
+_history_fd: tuple | None = None
 
 
 def save_history(entry: dict) -> None:
-    history = load_history()
-    history.append(entry)
-    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(history, f, indent=2, ensure_ascii=False)
+    """Append one entry – a single write() on a long-lived O_APPEND descriptor,
+    no read and no rewrite of earlier history."""
+    global _history_fd
+    if _history_fd is not None and not _is_same_file(_history_fd[1], _history_fd[0]):
+        # Deleted or replaced under us (history cleared, backup restored):
+        # writing on would land in an unlinked inode.
+        os.close(_history_fd[1])
+        _history_fd = None
+    if _history_fd is None or _history_fd[0] != HISTORY_FILE:
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+        _history_fd = (HISTORY_FILE, os.open(HISTORY_FILE, flags, 0o644))
+    os.write(_history_fd[1], orjson.dumps(entry) + b"\n")
+
+
+def _is_same_file(fd: int, path: Path) -> bool:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    fst = os.fstat(fd)
+    return (fst.st_ino, fst.st_dev) == (st.st_ino, st.st_dev)
+
+
+def _migrate_legacy_history() -> None:
+    """One-off: turn an old price_history.json array into HISTORY_FILE lines.
+
+    The old file is left in place; it is simply no longer read.
+    """
+    if HISTORY_FILE.exists() or not LEGACY_HISTORY_FILE.exists():
+        return
+    try:
+        entries = orjson.loads(LEGACY_HISTORY_FILE.read_bytes())
+        if not isinstance(entries, list):
+            log.warning("Not migrating %s: expected a JSON array", LEGACY_HISTORY_FILE.name)
+            return
+        fd, tmp = tempfile.mkstemp(dir=HISTORY_FILE.parent, prefix=".price_history.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(b"".join(orjson.dumps(entry) + b"\n" for entry in entries))
+            os.chmod(tmp, 0o644)   # mkstemp is 0600; match what save_history creates
+            os.replace(tmp, HISTORY_FILE)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+    except (OSError, orjson.JSONDecodeError) as exc:
+        log.warning("Could not migrate %s: %s", LEGACY_HISTORY_FILE.name, exc)
+        return
+    log.info("Migrated %d history entries to %s", len(entries), HISTORY_FILE.name)
+
+
+_migrate_legacy_history()
 
 
 # ── Status (latest check result) ──────────────────────────────────────────────
 
+def _read_status(path: Path) -> dict:
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
 def load_status() -> dict:
-    if STATUS_FILE.exists():
-        with open(STATUS_FILE, encoding="utf-8") as f:
-            return json.load(f)
-    return {}
+    return _cached_json(STATUS_FILE, _read_status) or {}
 
 
 def save_status(data: dict) -> None:
-    with open(STATUS_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    """Write to a temp file and swap it in, so a process killed mid-write
+    (e.g. Render's SIGTERM) never leaves a truncated status.json behind."""
+    tmp = STATUS_FILE.with_suffix(".json.tmp")
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    os.replace(tmp, STATUS_FILE)
 
 
 # ── Main check ────────────────────────────────────────────────────────────────
@@ -187,12 +548,12 @@ def run_check() -> dict | None:
         log.error("AMADEUS_CLIENT_ID and AMADEUS_CLIENT_SECRET must be set in .env")
         return None
 
-    log.info("─" * 60)
+    log.info(_SEP)
     log.info("Checking DIRECT flights %s → %s → %s", ORIGIN, DESTINATION, ORIGIN)
     log.info("Outbound: %s  |  Return: %s", DEPART_DATE, RETURN_DATE)
 
     try:
-        offers = search_flights(client_id, client_secret)
+        fetched_at, offers, from_cache = _search_with_retry(client_id, client_secret)
     except requests.HTTPError as exc:
         log.error("API error: %s – %s", exc.response.status_code, exc.response.text[:300])
         return None
@@ -207,7 +568,7 @@ def run_check() -> dict | None:
     cheapest = offers[0]
     price    = cheapest["price"]
     airlines = ", ".join(cheapest["airlines"])
-    now_str  = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M")
+    now_str  = fetched_at.strftime("%Y-%m-%d %H:%M")
     is_deal  = price < PRICE_LIMIT
 
     # Build result dict
@@ -216,29 +577,35 @@ def run_check() -> dict | None:
         "price_sek":  price,
         "airlines":   airlines,
         "is_deal":    is_deal,
-        "all_offers": offers[:5],
+        "all_offers": offers,
         "error":      None,
     }
 
-    # Save to history and status
-    save_history({"timestamp": now_str, "price_sek": price, "airlines": airlines})
-    save_status(result)
-
-    # Print results
-    print()
-    print(f"{Fore.CYAN}{'─'*60}")
-    print(f"  {Fore.WHITE}Route   : {ORIGIN} ↔ {DESTINATION}")
-    print(f"  {Fore.WHITE}Dates   : {DEPART_DATE}  →  {RETURN_DATE}")
-    print(f"  {Fore.WHITE}Checked : {now_str}")
-    print(f"{'─'*60}")
-    for i, o in enumerate(offers[:5], 1):
-        color = Fore.GREEN if o["price"] < PRICE_LIMIT else Fore.YELLOW
-        tag   = " ◀ CHEAPEST" if i == 1 else ""
-        print(f"  {color}#{i}  {o['price']:>8.0f} SEK  |  "
-              f"Airlines: {', '.join(o['airlines'])}  |  "
-              f"Direct{tag}")
-    print(f"{Fore.CYAN}{'─'*60}{Style.RESET_ALL}")
-    print()
+    # Save to history and status – a reused search result was already
+    # recorded (and alerted on) by the check that fetched it.
+    if not from_cache:
+        save_history({"timestamp": now_str, "price_sek": price, "airlines": airlines})
+        save_status(result)
+
+    # Print results – only for a human at a terminal (the log has the gist),
+    # and as a single write rather than one syscall per line.
+    if sys.stdout.isatty():
+        lines = [
+            "",
+            _HEAD,
+            f"  {Fore.WHITE}Route   : {ORIGIN} ↔ {DESTINATION}",
+            f"  {Fore.WHITE}Dates   : {DEPART_DATE}  →  {RETURN_DATE}",
+            f"  {Fore.WHITE}Checked : {now_str}",
+            _SEP,
+        ]
+        for i, o in enumerate(offers, 1):
+            color = Fore.GREEN if o["price"] < PRICE_LIMIT else Fore.YELLOW
+            tag   = " ◀ CHEAPEST" if i == 1 else ""
+            lines.append(f"  {color}#{i}  {o['price']:>8.0f} SEK  |  "
+                         f"Airlines: {', '.join(o['airlines'])}  |  "
+                         f"Direct{tag}")
+        lines += [_HEAD, ""]
+        _write_lines(lines)
 
     log.info("Cheapest offer: %.0f SEK (airlines: %s)", price, airlines)
 
@@ -253,10 +620,16 @@ def run_check() -> dict | None:
         )
         title = f"✈ Flight Deal! {price:.0f} SEK (< {PRICE_LIMIT} SEK)"
         log.info("🚨 PRICE ALERT: %.0f SEK is below threshold of %d SEK!", price, PRICE_LIMIT)
-        print(f"{Fore.GREEN}{'='*60}")
-        print(f"  🚨  PRICE ALERT!  {price:.0f} SEK  (limit: {PRICE_LIMIT} SEK)")
-        print(f"{'='*60}{Style.RESET_ALL}")
-        email_notify(title, msg)
+        if sys.stdout.isatty():
+            _write_lines([
+                f"{Fore.GREEN}{_ALERT_SEP}",
+                f"{Fore.GREEN}  🚨  PRICE ALERT!  {price:.0f} SEK  (limit: {PRICE_LIMIT} SEK)",
+                f"{Fore.GREEN}{_ALERT_SEP}",
+            ])
+        if from_cache:
+            log.info("Alert for this result was already sent – not e-mailing again.")
+        else:
+            email_notify(title, msg)
     else:
         log.info("Price %.0f SEK is above threshold %d SEK. No alert.", price, PRICE_LIMIT)
 
@@ -268,28 +641,38 @@ def run_check() -> dict | None:
 def main() -> None:
     load_dotenv(Path(__file__).parent / ".env")
 
-    print(f"{Fore.CYAN}")
-    print("╔══════════════════════════════════════════════════════╗")
-    print("║      ✈  FLIGHT PRICE CHECKER (DIRECT ONLY)  ✈       ║")
-    print(f"║  {ORIGIN} ↔ {DESTINATION}  |  Depart {DEPART_DATE}  Return {RETURN_DATE}  ║")
-    print(f"║  Alert threshold: {PRICE_LIMIT} SEK  |  Non-stop only            ║")
-    print(f"║  Checking every {CHECK_EVERY_HOURS} hours                            ║")
-    print("╚══════════════════════════════════════════════════════╝")
-    print(Style.RESET_ALL)
+    _write_lines([f"{Fore.CYAN}{line}" for line in (
+        "",
+        "╔══════════════════════════════════════════════════════╗",
+        "║      ✈  FLIGHT PRICE CHECKER (DIRECT ONLY)  ✈       ║",
+        f"║  {ORIGIN} ↔ {DESTINATION}  |  Depart {DEPART_DATE}  Return {RETURN_DATE}  ║",
+        f"║  Alert threshold: {PRICE_LIMIT} SEK  |  Non-stop only            ║",
+        f"║  Checking every {CHECK_EVERY_HOURS} hours                            ║",
+        "╚══════════════════════════════════════════════════════╝",
+        "",
+    )])
 
     # Run once immediately
     run_check()
 
-    # Then schedule
-    schedule.every(CHECK_EVERY_HOURS).hours.do(run_check)
+    # Then sleep straight through to each following check – one wakeup per
+    # check instead of polling every 30 s.
+    interval = CHECK_EVERY_HOURS * 3600
+    next_run = time.monotonic() + interval
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     log.info("Scheduler started – next check in %d hours. Press Ctrl+C to stop.", CHECK_EVERY_HOURS)
 
     try:
         while True:
-            schedule.run_pending()
-            time.sleep(30)
+            time.sleep(max(0.0, next_run - time.monotonic()))
+            run_check()
+            # If a check overran a whole interval, run the next one now
+            # rather than firing a burst of catch-up checks.
+            next_run = max(next_run + interval, time.monotonic())
     except KeyboardInterrupt:
         log.info("Stopped by user.")
+    except SystemExit:
+        log.info("Stopped by SIGTERM.")
 
 
 if __name__ == "__main__":